@@ -0,0 +1,67 @@
+import httpx
+
+from backend.integrations.competitors import CompetitorsClient
+from backend.integrations.llm import LLMClient
+from backend.integrations.partners import PartnersClient
+from backend.utils.config import get_settings
+
+
+class Clients:
+    """Outbound clients shared by all requests.
+
+    Opened on application startup and closed on shutdown, so connection pools
+    and the competitors browser are reused instead of being set up per request.
+    """
+
+    def __init__(self):
+        self.warehouse_http: httpx.AsyncClient | None = None
+        self.partners_http: httpx.AsyncClient | None = None
+        self.partners: PartnersClient | None = None
+        self.competitors: CompetitorsClient | None = None
+
+    def open(self) -> None:
+        settings = get_settings()
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+        self.warehouse_http = httpx.AsyncClient(
+            base_url=settings.warehouse_api_url,
+            http2=True,
+            limits=limits,
+        )
+        self.partners_http = httpx.AsyncClient(
+            base_url=settings.partners_api_url,
+            http2=True,
+            limits=limits,
+        )
+        self.partners = PartnersClient(
+            base_url=settings.partners_api_url,
+            client=self.partners_http,
+            concurrency=settings.partners_concurrency,
+        )
+        self.competitors = CompetitorsClient(
+            base_url=settings.competitors_api_url,
+            llm=LLMClient(
+                base_url=settings.llm_base_url,
+                api_key=settings.llm_api_key,
+                provider=settings.llm_provider,
+                model=settings.llm_name,
+                concurrency=settings.llm_concurrency,
+            ),
+            cache_ttl=settings.llm_cache_ttl,
+            concurrency=settings.competitors_concurrency,
+        )
+
+    async def close(self) -> None:
+        if self.warehouse_http:
+            await self.warehouse_http.aclose()
+            self.warehouse_http = None
+        if self.partners_http:
+            await self.partners_http.aclose()
+            self.partners_http = None
+            self.partners = None
+        if self.competitors:
+            await self.competitors.close()
+            self.competitors = None
+
+
+clients = Clients()
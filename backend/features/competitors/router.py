@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi.responses import StreamingResponse
 
 from backend.features.competitors.service import CompetitorsService, get_competitors_service
 from backend.integrations.competitors import SearchCompetitors
@@ -35,3 +36,23 @@ async def get_task(
     """Get the status of a competitors stock search task"""
     result = await competitors_service.get_task_status(task_id)
     return result
+
+@competitors_router.get("/stream")
+async def stream_task(
+    task_id: str,
+    competitors_service: CompetitorsService = Depends(get_competitors_service)
+) -> StreamingResponse:
+    """Stream status changes of a competitors stock search task as server-sent events.
+
+    The last event carries the result of a completed search.
+    """
+    async def events():
+        async for task in competitors_service.stream_task_status(task_id):
+            yield f"data: {task.model_dump_json(exclude={'owner'})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Don't let nginx hold events in its buffer
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
\ No newline at end of file
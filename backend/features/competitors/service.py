@@ -1,10 +1,12 @@
+import asyncio
 from datetime import datetime
+from typing import AsyncIterator
 
 from fastapi import Depends
 
-from backend.integrations.competitors import CompetitorsClient, CompetitorsSearchException
-from backend.integrations.llm import LLMClient
-from backend.integrations.warehouse import WarehouseClient, WarehouseProductFolder
+from backend.clients import clients
+from backend.integrations.competitors import CompetitorsClient, CompetitorsProduct, CompetitorsSearchException
+from backend.integrations.warehouse import WarehouseClient, WarehouseProductFolder, WarehouseStockItem
 from backend.schemas import StockSearchResult, StockSearchRow
 from backend.tasks import Task, TaskStatus, task_store
 from backend.utils.auth import auth_header
@@ -20,21 +22,17 @@ class CompetitorsService:
         # Clients
         self.warehouse = WarehouseClient(
             api_url=settings.warehouse_api_url,
-            access_token=warehouse_access_token
-        )
-        self.competitors = CompetitorsClient(
-            base_url=settings.competitors_api_url,
-            llm=LLMClient(
-                base_url=settings.llm_base_url,
-                api_key=settings.llm_api_key,
-                provider=settings.llm_provider,
-                model=settings.llm_name
-            )
+            access_token=warehouse_access_token,
+            client=clients.warehouse_http,
         )
+        self.competitors: CompetitorsClient = clients.competitors
 
         # Warehouse entities
         self.main_store_id = settings.warehouse_main_store_id
 
+        self.llm_batch_size = settings.llm_batch_size
+        self.llm_batch_max_chars = settings.llm_batch_max_chars
+
     async def get_product_groups(self) -> list[WarehouseProductFolder]:
         return await self.warehouse.get_product_groups()
 
@@ -56,8 +54,6 @@ class CompetitorsService:
                 store_id=self.main_store_id,
                 product_group_id=product_group_id
             )
-            result = []
-
             logger.info(
                 "Start processing stock items",
                 extra={
@@ -65,38 +61,41 @@ class CompetitorsService:
                     "processing_items": len(warehouse_stock.rows)
                 }
             )
+            pages = await asyncio.gather(
+                *(self._fetch_search_results(item) for item in warehouse_stock.rows)
+            )
 
-            for item in warehouse_stock.rows:
-                logger.debug("Searching for product", extra={"product_name": item.name})
-                try:
-                    found_product = await self.competitors.search(item.name)
-                    result.append(
-                        StockSearchRow(
-                            name=item.name,
-                            stock=item.stock,
-                            price=item.price,
-                            found_name=found_product.name,
-                            found_price=found_product.price,
-                            found_url=found_product.url,
-                        )
-                    )
-                except CompetitorsSearchException:
-                    result.append(
-                        StockSearchRow(
-                            name=item.name,
-                            stock=item.stock,
-                            price=item.price,
-                            found_name=None,
-                            found_price=None,
-                            found_url=None,
-                        )
-                    )
+            # Parse found pages with the LLM in batches instead of one request per item
+            pending = [
+                (idx, (item.name, html))
+                for idx, (item, html) in enumerate(zip(warehouse_stock.rows, pages))
+                if html
+            ]
+            batches = self._split_batches(pending)
+            parsed_batches = await asyncio.gather(
+                *(self._parse_batch([entry for _, entry in batch]) for batch in batches)
+            )
+            found_products: list[CompetitorsProduct | None] = [None] * len(warehouse_stock.rows)
+            for batch, products in zip(batches, parsed_batches):
+                for (idx, _), product in zip(batch, products):
+                    found_products[idx] = product
+
+            result = [
+                StockSearchRow(
+                    name=item.name,
+                    stock=item.stock,
+                    price=item.price,
+                    found_name=found_product.name if found_product else None,
+                    found_price=found_product.price if found_product else None,
+                    found_url=found_product.url if found_product else None,
+                ) for item, found_product in zip(warehouse_stock.rows, found_products)
+            ]
 
             logger.info("Competitors search completed", extra={"processed_items": len(result)})
             search_result = StockSearchResult(size=len(result), rows=result)
             task = task_store.get_task(task_id, self.owner)
             task.status = TaskStatus.COMPLETED
-            task.result = search_result
+            task.result = search_result.model_dump()
             task_store.set_task(task_id, task)
             return search_result
 
@@ -108,6 +107,52 @@ class CompetitorsService:
             task_store.set_task(task_id, task)
             raise
 
+    async def _fetch_search_results(self, item: WarehouseStockItem) -> str | None:
+        """Get search results HTML for a single stock item on Competitors site"""
+        logger.debug("Searching for product", extra={"product_name": item.name})
+        try:
+            return await self.competitors.search(item.name)
+        except CompetitorsSearchException:
+            return None
+
+    def _split_batches(self, pending: list[tuple[int, tuple[str, str]]]) -> list[list[tuple[int, tuple[str, str]]]]:
+        """Split pages into LLM batches limited by number of pages and their total HTML length.
+
+        A page longer than the length limit is parsed in a batch of its own.
+        """
+        batches = []
+        batch = []
+        batch_chars = 0
+        for entry in pending:
+            html_length = len(entry[1][1])
+            if batch and (
+                len(batch) >= self.llm_batch_size
+                or batch_chars + html_length > self.llm_batch_max_chars
+            ):
+                batches.append(batch)
+                batch = []
+                batch_chars = 0
+            batch.append(entry)
+            batch_chars += html_length
+
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _parse_batch(self, items: list[tuple[str, str]]) -> list[CompetitorsProduct | None]:
+        """Parse a batch of search results, treating a failed batch as not found"""
+        try:
+            return await self.competitors.parse_products_html(items)
+        except CompetitorsSearchException:
+            logger.warning(
+                "Competitors batch not parsed, reporting its items as not found",
+                extra={
+                    "item_names": [item_name for item_name, _ in items],
+                    "html_length": sum(len(html) for _, html in items),
+                }
+            )
+            return [None] * len(items)
+
     async def get_task_status(self, task_id: str) -> Task:
         """Get the status of a competitors search task"""
         task = task_store.get_task(task_id, self.owner)
@@ -124,6 +169,36 @@ class CompetitorsService:
 
         return task
 
+    async def stream_task_status(self, task_id: str, heartbeat: float = 15.0) -> AsyncIterator[Task]:
+        """Yield a competitors search task on every change until it is not running anymore.
+
+        The task is yielded again every heartbeat seconds without changes,
+        so idle connections are not dropped. A finished task is removed from
+        the store once it has been yielded, as in get_task_status.
+        """
+        while True:
+            # Taken before reading the task, so a change while a frame is sent still wakes us up
+            changed = task_store.changed(task_id)
+            task = task_store.get_task(task_id, self.owner)
+            if not task:
+                task_store.discard_changes(task_id)
+                yield Task(
+                    id="not_found",
+                    owner=self.owner,
+                    status=TaskStatus.NOT_FOUND,
+                )
+                return
+
+            yield task
+            if task.status != TaskStatus.RUNNING:
+                task_store.remove_task(task_id, self.owner)
+                return
+
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                pass
+
 
 async def get_competitors_service(
     access_token: str = Depends(auth_header),
@@ -1,6 +1,9 @@
+import asyncio
+
 from fastapi import UploadFile, HTTPException, Depends
 from pydantic import BaseModel
 
+from backend.clients import clients
 from backend.integrations.csv_handler import CSVHandler, CsvRow
 from backend.integrations.warehouse import WarehouseProduct, WarehouseClient, WarehouseDemand
 from backend.utils.auth import auth_header
@@ -23,7 +26,9 @@ class DemandService:
         # Clients
         self.warehouse = WarehouseClient(
             api_url=settings.warehouse_api_url,
-            access_token=warehouse_access_token
+            access_token=warehouse_access_token,
+            client=clients.warehouse_http,
+            concurrency=settings.warehouse_concurrency,
         )
         self.csv_service = CSVHandler(
             upload_folder=settings.upload_folder
@@ -38,7 +43,7 @@ class DemandService:
         """Process CSV file and create demand in Warehouse"""
         logger.info("Start creating demand", extra={"file_name": file.filename})
         file_path = await self.csv_service.save_upload_file(file)
-        rows = self.csv_service.read_csv_data(file_path)
+        rows = await asyncio.to_thread(self.csv_service.read_csv_data, file_path)
         valid_rows, invalid_rows = self.csv_service.filter_rows(rows)
 
         if not valid_rows:
@@ -49,8 +54,11 @@ class DemandService:
             )
 
         warehouse_products = await self.warehouse.search_products([row.product_name for row in valid_rows])
-        prepared_products, unmatched_rows = self.prepare_products(valid_rows, warehouse_products.products)
-        not_found_rows = [row for row in valid_rows if row.product_name in warehouse_products.not_found]
+        prepared_products, unmatched_rows = await asyncio.to_thread(
+            self.prepare_products, valid_rows, warehouse_products.products
+        )
+        not_found_names = set(warehouse_products.not_found)
+        not_found_rows = [row for row in valid_rows if row.product_name in not_found_names]
 
         result = await self.warehouse.create_demand(
             organization_id=self.organization_id,
@@ -78,14 +86,18 @@ class DemandService:
         1. Find matching product where row.serial_number is in product.things
         2. Create new product with matched product ID and row data
         """
+        # Index products by serial number, first product wins as with a linear scan
+        serial_index: dict[str, WarehouseProduct] = {}
+        for product in products:
+            if not product.things:
+                continue
+            for serial_number in product.things:
+                serial_index.setdefault(serial_number, product)
+
         prepared_products = []
         unmatched_rows = []
         for row in rows:
-            # Find product where serial number matches one in things list
-            matched_product = next(
-                (p for p in products if p.things and row.serial_number in p.things),
-                None
-            )
+            matched_product = serial_index.get(row.serial_number)
 
             if not matched_product:
                 unmatched_rows.append(row)
@@ -95,21 +107,22 @@ class DemandService:
                 )
                 continue
 
-            adjusted_product = WarehouseProduct(
+            # Both sources are already validated models, skip validating again
+            adjusted_product = WarehouseProduct.model_construct(
                 id=matched_product.id,
                 name=row.product_name,
                 things=[row.serial_number],
                 purchase_price=row.purchase_price
             )
             prepared_products.append(adjusted_product)
-            logger.info(
-                "Prepared products",
-                extra={
-                    "product_count": len(prepared_products),
-                    "unmatched_rows": len(unmatched_rows)
-                }
-            )
 
+        logger.info(
+            "Prepared products",
+            extra={
+                "product_count": len(prepared_products),
+                "unmatched_rows": len(unmatched_rows)
+            }
+        )
         return prepared_products, unmatched_rows
 
 
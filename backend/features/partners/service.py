@@ -1,7 +1,10 @@
+import asyncio
+
 from fastapi import Depends
 
+from backend.clients import clients
 from backend.integrations.partners import PartnersResponse, PartnersClient
-from backend.integrations.warehouse import WarehouseClient
+from backend.integrations.warehouse import WarehouseClient, WarehouseStockItem
 from backend.schemas import StockSearchResult, StockSearchRow
 from backend.utils.auth import auth_header
 from backend.utils.config import get_settings
@@ -16,10 +19,9 @@ class PartnersService:
         self.warehouse = WarehouseClient(
             api_url=settings.warehouse_api_url,
             access_token=warehouse_access_token,
+            client=clients.warehouse_http,
         )
-        self.partners_client = PartnersClient(
-            base_url=settings.partners_api_url,
-        )
+        self.partners_client: PartnersClient = clients.partners
 
         # Warehouse entities
         self.main_store_id = settings.warehouse_main_store_id
@@ -32,8 +34,6 @@ class PartnersService:
             store_id=self.main_store_id,
             product_group_id=self.android_group_id
         )
-        result = []
-
         logger.info(
             "Start processing stock items",
             extra={
@@ -41,30 +41,32 @@ class PartnersService:
                 "processing_items": len(stock.rows)
             }
         )
-        for item in stock.rows:
-            logger.debug("Searching for product", extra={"product_name": item.name})
-            found_product: PartnersResponse = await self.partners_client.search(item.name)
-            logger.debug(
-                "Product search completed",
-                extra={
-                    "product_name": item.name,
-                    "found": bool(found_product)
-                }
-            )
-            result.append(
-                StockSearchRow(
-                    name=item.name,
-                    stock=item.stock,
-                    price=item.price,
-                    found_name=found_product.product_name if found_product else None,
-                    found_price=None,
-                    found_url=found_product.url if found_product else None,
-                )
-            )
+        result = await asyncio.gather(*(self._search_item(item) for item in stock.rows))
 
         logger.info("Partners search completed", extra={"processed_items": len(result)})
         return StockSearchResult(size=len(result), rows=result)
 
+    async def _search_item(self, item: WarehouseStockItem) -> StockSearchRow:
+        """Search for a single stock item on Partners site"""
+        logger.debug("Searching for product", extra={"product_name": item.name})
+        found_product: PartnersResponse = await self.partners_client.search(item.name)
+
+        logger.debug(
+            "Product search completed",
+            extra={
+                "product_name": item.name,
+                "found": bool(found_product)
+            }
+        )
+        return StockSearchRow(
+            name=item.name,
+            stock=item.stock,
+            price=item.price,
+            found_name=found_product.product_name if found_product else None,
+            found_price=None,
+            found_url=found_product.url if found_product else None,
+        )
+
 async def get_partners_service(
     access_token: str = Depends(auth_header),
 ) -> PartnersService:
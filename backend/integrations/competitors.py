@@ -1,7 +1,10 @@
+import asyncio
+import hashlib
 from typing import Literal
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
+from cachetools import TTLCache
 from fastapi import HTTPException
 from playwright.async_api import async_playwright, BrowserContext
 from pydantic import BaseModel, Field
@@ -10,6 +13,36 @@ from backend.integrations.llm import LLMClient, HTMLParsingException
 from backend.utils.logger import logger
 
 
+# Instructions for finding a product in search results, called with item_name
+PRODUCT_INSTRUCTIONS = (
+    "You are provided with a html of the products page.\n"
+    "Find the product {item_name}. Product name might be slightly different.\n"
+    "Return name, price and url of this product from the page.\n"
+    "Example input: Iphone 14 128 Purple\n"
+    "Example JSON output:\n"
+    """
+    {{
+        "name": "Смартфон Apple iPhone 14 128GB, фиолетовый",
+        "price": "16000",
+        "url": "/iphone-16-128gb-fioletovyy/"
+    }}
+    """
+    "If product is not found, return empty string for name, price and url.\n"
+    "Example JSON output for not found product:\n"
+    """
+    {{
+        "name": "",
+        "price": "",
+        "url": ""
+    }}
+    """
+).format
+
+
+# Marks a cache miss, since None is a cached "not found" answer
+_NOT_CACHED = object()
+
+
 class CompetitorsSearchException(Exception):
     pass
 
@@ -24,37 +57,46 @@ class SearchCompetitors(BaseModel):
 
 
 class CompetitorsClient:
-    def __init__(self, base_url: str, llm: LLMClient):
+    def __init__(self, base_url: str, llm: LLMClient, cache_ttl: int = 86_400, concurrency: int = 4):
         self.base_url = base_url
         self.llm = llm
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+        # Parsed products keyed by item name and digest of its search results HTML
+        self._parsed_cache: TTLCache[tuple[str, bytes], CompetitorsProduct | None] = TTLCache(
+            maxsize=50_000,
+            ttl=cache_ttl,
+        )
 
         self._context: BrowserContext | None = None
         self._playwright = None
+        self._browser_lock = asyncio.Lock()
 
     async def _ensure_browser(self):
         """Ensure persistent browser context is initialized."""
-        if not self._context:
-            try:
-                self._playwright = await async_playwright().start()
-                self._context = await self._playwright.chromium.launch_persistent_context(
-                    user_data_dir='/tmp/playwright_context',
-                    headless=True,
-                    viewport={'width': 800, 'height': 600},
-                    java_script_enabled=True,
-                    ignore_https_errors=True,
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                    args=[
-                        '--disable-gpu',
-                        '--disable-dev-shm-usage',
-                        '--disable-setuid-sandbox',
-                        '--no-sandbox',
-                        '--no-zygote',
-                    ]
-                )
-            except Exception as e:
-                logger.error("Failed to initialize browser", extra={"error": str(e)})
-                await self._cleanup()
-                raise
+        async with self._browser_lock:
+            if not self._context:
+                try:
+                    self._playwright = await async_playwright().start()
+                    self._context = await self._playwright.chromium.launch_persistent_context(
+                        user_data_dir='/tmp/playwright_context',
+                        headless=True,
+                        viewport={'width': 800, 'height': 600},
+                        java_script_enabled=True,
+                        ignore_https_errors=True,
+                        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+                        args=[
+                            '--disable-gpu',
+                            '--disable-dev-shm-usage',
+                            '--disable-setuid-sandbox',
+                            '--no-sandbox',
+                            '--no-zygote',
+                        ]
+                    )
+                except Exception as e:
+                    logger.error("Failed to initialize browser", extra={"error": str(e)})
+                    await self._cleanup()
+                    raise
 
     async def _cleanup(self):
         """Cleanup Playwright resources."""
@@ -68,6 +110,10 @@ class CompetitorsClient:
         except Exception as e:
             logger.error("Failed to cleanup Playwright resources", extra={"error": str(e)})
 
+    async def close(self):
+        """Release Playwright resources."""
+        await self._cleanup()
+
     async def __aenter__(self):
         """Initialize Playwright resources."""
         await self._ensure_browser()
@@ -77,7 +123,7 @@ class CompetitorsClient:
         """Cleanup Playwright resources."""
         await self._cleanup()
 
-    async def search(self, query: str) -> CompetitorsProduct:
+    async def search(self, query: str) -> str:
         """Search products on Competitors site and return HTML content of div with results."""
         if not query:
             logger.error("Empty search query provided")
@@ -90,74 +136,92 @@ class CompetitorsClient:
             if not self._context:
                 raise CompetitorsSearchException("Browser context not initialized")
 
-            page = await self._context.new_page()
-            try:
-                search_url = urljoin(self.base_url, f"search/?q={query}&digiSearch=true&term={query}")
-                await page.goto(search_url, wait_until='networkidle', timeout=60000)
+            # Limit open pages of the shared browser
+            async with self._semaphore:
+                page = await self._context.new_page()
+                try:
+                    search_url = urljoin(self.base_url, f"search/?q={query}&digiSearch=true&term={query}")
+                    await page.goto(search_url, wait_until='networkidle', timeout=60000)
                 
-                # Wait for the product grid to appear
-                await page.wait_for_selector(".digi-main__results", timeout=60000)
+                    # Wait for the product grid to appear
+                    await page.wait_for_selector(".digi-main__results", timeout=60000)
                 
-                html = await page.content()
-                search_results = BeautifulSoup(html, 'html.parser').find('div', class_='digi-products')
-                found_products = search_results.find_all('div', class_='digi-product')
-                for product in found_products:
-                    parsed_product = await self.parse_product_html(item_name=query, html=str(product))
-                    if parsed_product.name:
-                        parsed_product.url = urljoin(self.base_url, parsed_product.url)
-                        logger.info(
-                            "Product found on search page",
-                            extra={
-                                "product_name": parsed_product.name,
-                                "url": parsed_product.url,
-                                "price": parsed_product.price
-                            }
-                        )
-                        break
-            
-                return parsed_product
+                    html = await page.content()
+                    search_results = BeautifulSoup(html, 'html.parser').find('div', class_='digi-products')
+
+                    # Nothing for the LLM to look at without product cards
+                    if not search_results or not search_results.find(class_='digi-product'):
+                        logger.info("No products in Competitors search results", extra={"query": query})
+                        return ""
+                    return str(search_results)
 
-            finally:
-                await page.close()
+                finally:
+                    await page.close()
                     
         except Exception as e:
             logger.error("Failed to search competitors", extra={"error": str(e), "query": query})
             raise CompetitorsSearchException() from e
 
-    async def parse_product_html(self, item_name: str, html: str) -> CompetitorsProduct:
-        """Parse HTML content of product page and return product data"""
-        if not html:
-            raise CompetitorsSearchException("Product HTML not found")
+    async def parse_products_html(self, items: list[tuple[str, str]]) -> list[CompetitorsProduct | None]:
+        """Parse search results HTML of several products, reusing cached answers.
+
+        Each item is a pair of product name and HTML of its search results.
+        Returns found products in the same order, None for not found ones.
+        """
+        keys = [
+            (item_name, hashlib.blake2b(html.encode(), digest_size=16).digest())
+            for item_name, html in items
+        ]
+        result: list[CompetitorsProduct | None] = [None] * len(items)
+        missed = []
+        for idx, key in enumerate(keys):
+            cached = self._parsed_cache.get(key, _NOT_CACHED)
+            if cached is _NOT_CACHED:
+                missed.append(idx)
+            else:
+                result[idx] = cached
+
+        logger.debug("Parsed products cache lookup", extra={"hits": len(items) - len(missed), "misses": len(missed)})
+        if missed:
+            parsed = await self._parse_products_html([items[idx] for idx in missed])
+            for idx, product in zip(missed, parsed):
+                self._parsed_cache[keys[idx]] = product
+                result[idx] = product
+        return result
+
+    async def _parse_products_html(self, items: list[tuple[str, str]]) -> list[CompetitorsProduct | None]:
+        """Parse search results HTML of several products in one LLM request"""
+        if not items:
+            return []
 
         try:
-            product: CompetitorsProduct = await self.llm.parse_html(
-                html=html,
-                instructions=(
-                    "You are provided with a html of the products page.\n"
-                    f"Find the product {item_name}. Product name might be slightly different.\n"
-                    "Return name, price and url of this product from the page.\n"
-                    "Example input: Iphone 14 128 Purple\n"
-                    "Example JSON output:\n"
-                    """
-                    {
-                        "name": "Смартфон Apple iPhone 14 128GB, фиолетовый",
-                        "price": "16000",
-                        "url": "/iphone-16-128gb-fioletovyy/"
-                    }
-                    """
-                    "If product is not found, return empty string for name, price and url.\n"
-                    "Example JSON output for not found product:\n"
-                    """
-                    {
-                        "name": "",
-                        "price": "",
-                        "url": ""
-                    }
-                    """
-                ),
+            products: list[CompetitorsProduct] = await self.llm.parse_html_batch(
+                items=[
+                    (PRODUCT_INSTRUCTIONS(item_name=item_name), html)
+                    for item_name, html in items
+                ],
                 response_format=CompetitorsProduct,
             )
-            return product
         except HTMLParsingException as e:
-            logger.error("Failed to parse product HTML", extra={"item_name": item_name})
+            logger.error("Failed to parse products HTML", extra={"item_names": [name for name, _ in items]})
             raise CompetitorsSearchException() from e
+
+        result = []
+        for (item_name, _), product in zip(items, products):
+            if not product.name:
+                logger.info("Product not found on search page", extra={"item_name": item_name})
+                result.append(None)
+                continue
+
+            product.url = urljoin(self.base_url, product.url)
+            logger.info(
+                "Product found on search page",
+                extra={
+                    "item_name": item_name,
+                    "product_name": product.name,
+                    "url": product.url,
+                    "price": product.price
+                }
+            )
+            result.append(product)
+        return result
@@ -1,6 +1,10 @@
+import asyncio
 import csv
+import shutil
+import sys
+from itertools import compress
 from pathlib import Path
-from typing import List
+from typing import BinaryIO, List
 import os
 
 from fastapi import UploadFile, HTTPException
@@ -8,6 +12,11 @@ from pydantic import BaseModel, Field
 
 from backend.utils.logger import logger
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Serial number, product name and purchase price columns of the supplier CSV
+CSV_COLUMNS = ('÷', 'Товар', 'Цена поставки')
+
 
 class CsvRow(BaseModel):
     idx: int = Field(None, description="Row index in the CSV file")
@@ -30,11 +39,26 @@ class CSVHandler:
             )
 
         file_path = self.upload_folder / file.filename
-        content = await file.read()
-        with open(file_path, 'wb') as f:
-            f.write(content)
+        await file.seek(0)
+        await asyncio.to_thread(self.copy_to_disk, file.file, file_path)
         return str(file_path)
 
+    def copy_to_disk(self, source: BinaryIO, file_path: Path) -> None:
+        """Copy spooled upload to disk, in kernel space if it was rolled over to a file"""
+        with open(file_path, 'wb') as destination:
+            # Same private flag of SpooledTemporaryFile that Starlette relies on,
+            # sendfile into a regular file is only supported on Linux
+            if getattr(source, '_rolled', False) and sys.platform.startswith('linux'):
+                size = os.fstat(source.fileno()).st_size
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(destination.fileno(), source.fileno(), offset, size - offset)
+                    if not sent:
+                        break
+                    offset += sent
+            else:
+                shutil.copyfileobj(source, destination, UPLOAD_CHUNK_SIZE)
+
     def read_csv_data(self, file_path: str) -> List[CsvRow]:
         """Read and parse CSV file into DemandItems"""
         if not os.path.exists(file_path):
@@ -43,26 +67,47 @@ class CSVHandler:
                 detail="File not found"
             )
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            return [
-                CsvRow(
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            try:
+                serial_idx, name_idx, price_idx = (
+                    header.index(column) for column in CSV_COLUMNS
+                )
+            except ValueError:
+                logger.error("CSV file misses required columns", extra={"header": header})
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"CSV file must have columns: {', '.join(CSV_COLUMNS)}"
+                )
+
+            # Short rows get empty cells so they end up among invalid rows
+            width = max(serial_idx, name_idx, price_idx) + 1
+            rows = []
+            for row in reader:
+                # Blank lines are skipped, as DictReader did
+                if not row:
+                    continue
+                if len(row) < width:
+                    row += [''] * (width - len(row))
+                # Cells are plain strings and the price is parsed here, skip validation
+                rows.append(CsvRow.model_construct(
                     idx=reader.line_num,
-                    serial_number=row['÷'],
-                    product_name=row['Товар'],
-                    purchase_price=self.parse_price(row['Цена поставки']),
-                ) for row in reader
-            ]
+                    serial_number=row[serial_idx],
+                    product_name=row[name_idx],
+                    purchase_price=self.parse_price(row[price_idx]),
+                ))
+            return rows
     
     def filter_rows(self, rows: list[CsvRow]) -> tuple[list[CsvRow], list[CsvRow]]:
-        valid_rows = []
-        invalid_rows = []
-        for row in rows:
-            if self.is_valid_row(row):
-                valid_rows.append(row)
-            else:
-                invalid_rows.append(row)
-        
+        """Split rows into valid and invalid ones.
+
+        A row is valid when it has serial number, product name and purchase price.
+        """
+        mask = [bool(row.serial_number and row.product_name and row.purchase_price) for row in rows]
+        valid_rows = list(compress(rows, mask))
+        invalid_rows = list(compress(rows, (not is_valid for is_valid in mask)))
+
         logger.info(
             "Filtered rows",
             extra={
@@ -73,11 +118,6 @@ class CSVHandler:
         
         return valid_rows, invalid_rows
 
-    def is_valid_row(self, row: CsvRow) -> bool:
-        if not row.serial_number or not row.product_name or not row.purchase_price:
-            return False
-        return True
-
     def parse_price(self, row: str) -> int | None:
         """Parse price string into float, handling various formats.
     
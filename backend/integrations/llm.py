@@ -1,3 +1,4 @@
+import asyncio
 import json
 from typing import Dict
 
@@ -5,6 +6,7 @@ import litellm
 from openai import AsyncOpenAI
 from fastapi import HTTPException
 from pydantic import BaseModel
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from backend.utils.logger import logger
 
@@ -14,12 +16,13 @@ class HTMLParsingException(Exception):
 
 
 class LLMClient:
-    def __init__(self, base_url: str | None, api_key: str, provider: str, model: str):
+    def __init__(self, base_url: str | None, api_key: str, provider: str, model: str, concurrency: int = 4):
         self.client = AsyncOpenAI(base_url=base_url, api_key=api_key)
         litellm.api_key = self.client.api_key
         litellm.api_base = self.client.base_url
         self.provider = provider
         self.model = model
+        self._semaphore = asyncio.Semaphore(concurrency)
 
     async def create_completion(
         self,
@@ -49,6 +52,18 @@ class LLMClient:
 
         return result
 
+    @retry(
+        wait=wait_exponential(multiplier=0.2, max=4),
+        stop=stop_after_attempt(5),
+        retry=retry_if_exception_type((
+            litellm.APIConnectionError,
+            litellm.RateLimitError,
+            litellm.InternalServerError,
+            litellm.ServiceUnavailableError,
+            litellm.Timeout,
+        )),
+        reraise=True,
+    )
     async def complete(
         self,
         model: str,
@@ -56,11 +71,12 @@ class LLMClient:
         messages: list[Dict[str, str]],
     ):
         """Complete a text using LLM API"""
-        response = await litellm.acompletion(
-            model=provider + '/' + model, 
-            messages=messages,
-            response_format={"type": "json_object"},
-        )   
+        async with self._semaphore:
+            response = await litellm.acompletion(
+                model=provider + '/' + model, 
+                messages=messages,
+                response_format={"type": "json_object"},
+            )
         result = response.choices[0].message.content
 
         logger.debug(
@@ -76,31 +92,45 @@ class LLMClient:
 
         return result
 
-    async def parse_html(
+    async def parse_html_batch(
         self,
-        html: str,
-        instructions: str,
-        response_format: BaseModel,
-    ) -> BaseModel:
+        items: list[tuple[str, str]],
+        response_format: type[BaseModel],
+    ) -> list[BaseModel]:
+        """Parse several HTML pages in a single completion.
+
+        Each item is a pair of instructions and HTML page.
+        Results are returned in the same order as items.
+        """
         logger.debug(
-            "Parsing HTML on the base of instructions",
+            "Parsing HTML batch on the base of instructions",
             extra={
-                "instruction_length": len(instructions),
-                "html_length": len(html)
+                "batch_size": len(items),
+                "html_length": sum(len(html) for _, html in items)
             }
         )
-        
+
         system_message = {
             "role": "system",
-            "content": "You are a web scrapper. Answer questions about the the page."
+            "content": "You are a web scrapper. Answer questions about the the pages."
         }
-        
+
+        entries = "\n\n".join(
+            f"Entry {idx}:\n"
+            f"Instructions: {instructions}"
+            "\n\n"
+            f" HTML page: {html}"
+            for idx, (instructions, html) in enumerate(items)
+        )
         user_message = {
             "role": "user",
             "content": (
-                f"Instructions: {instructions}"
+                f"You are provided with {len(items)} entries. "
+                "Follow the instructions of every entry against its HTML page. "
+                'Return a JSON object {"results": [...]} where results contains '
+                "the JSON output of every entry in the same order as the entries."
                 "\n\n"
-                f" HTML page: {html}"
+                f"{entries}"
             )
         }
 
@@ -110,11 +140,13 @@ class LLMClient:
                 provider=self.provider,
                 messages=[system_message, user_message],
             )
-            result = response_format.model_validate(json.loads(completion))
-            return result
+            results = json.loads(completion)["results"]
+            if len(results) != len(items):
+                raise ValueError(f"Expected {len(items)} results, got {len(results)}")
+            return [response_format.model_validate(result) for result in results]
         except Exception as e:
             logger.error(
-                "Error parsing HTML",
+                "Error parsing HTML batch",
                 extra={"error": str(e)}
             )
-            raise HTMLParsingException() from e
\ No newline at end of file
+            raise HTMLParsingException() from e
@@ -1,21 +1,66 @@
+import asyncio
+import re
+from html import unescape
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
 import httpx
 from fastapi import HTTPException
 from pydantic import BaseModel, Field
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 from backend.utils.logger import logger
 
 
+# Catalog item and its title link, matched before falling back to a full HTML parse
+CATALOG_ITEM = re.compile(
+    r'<div\b[^>]*\bclass="(?:[^"]*\s)?catalog-item(?:\s[^"]*)?"[^>]*>',
+    re.IGNORECASE,
+)
+CATALOG_ITEM_LINK = re.compile(
+    r'<div\b[^>]*\bclass="(?:[^"]*\s)?catalog-item__title(?:\s[^"]*)?"[^>]*>'
+    r'\s*<a\b[^>]*\bhref="([^"]*)"[^>]*>(.*?)</a>',
+    re.DOTALL | re.IGNORECASE,
+)
+HTML_TAG = re.compile(r'<[^>]+>')
+
+
+def _match_first_item_link(html: str) -> re.Match | None:
+    """Match the title link of the first catalog item.
+
+    Returns None when the markup doesn't fit the patterns, so the page is
+    parsed with BeautifulSoup instead.
+    """
+    item = CATALOG_ITEM.search(html)
+    # Catalog markup before the matched item, e.g. with other quoting, isn't understood here
+    if not item or html.find('catalog-item') < item.start():
+        return None
+
+    # The end of the first item is only known from the start of the next one,
+    # otherwise the link might come from a block after the catalog
+    next_item = CATALOG_ITEM.search(html, item.end())
+    if not next_item:
+        return None
+    return CATALOG_ITEM_LINK.search(html, item.end(), next_item.start())
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Retry transport errors, rate limits and server errors"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+
 class PartnersResponse(BaseModel):
     product_name: str = Field(..., description="Name of the product")
     url: str | None = Field(..., description="URL of the product")
 
 
 class PartnersClient:
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, client: httpx.AsyncClient, concurrency: int = 8):
         self.base_url = base_url
+        self.client = client
+        self._semaphore = asyncio.Semaphore(concurrency)
 
     async def search(self, query: str) -> PartnersResponse | None:
         """Search products on Partners site and return HTML content."""
@@ -24,21 +69,40 @@ class PartnersClient:
             raise HTTPException(status_code=400, detail="Search query is required")
             
         logger.info("Searching Partners", extra={"query": query})
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url=urljoin(self.base_url, "search"),
+        html = await self._get_search_page(query)
+        return self.parse_product_html(html)
+
+    @retry(
+        wait=wait_exponential(multiplier=0.2, max=4),
+        stop=stop_after_attempt(5),
+        retry=retry_if_exception(is_retryable_error),
+        reraise=True,
+    )
+    async def _get_search_page(self, query: str) -> str:
+        """Get search results page, limiting concurrent requests to Partners site"""
+        async with self._semaphore:
+            response = await self.client.get(
+                url="search",
                 params={"search": query, "category_id": 0},
                 timeout=30.0,
                 follow_redirects=True
             )
-            response.raise_for_status()
-            return self.parse_product_html(response.text)
+        response.raise_for_status()
+        return response.text
 
     def parse_product_html(self, html: str) -> PartnersResponse | None:
         """Parse HTML content of product page and return product data"""
         if not html:
             return None
 
+        match = _match_first_item_link(html)
+        if match:
+            href, text = match.groups()
+            return PartnersResponse(
+                url=urljoin(self.base_url, unescape(href)),
+                product_name=unescape(HTML_TAG.sub('', text)).strip()
+            )
+
         soup = BeautifulSoup(html, 'html.parser')
 
         # Find first catalog item
@@ -1,6 +1,5 @@
 import asyncio
 from typing import Dict, Any
-from urllib.parse import urljoin
 
 import httpx
 from fastapi import HTTPException
@@ -43,9 +42,40 @@ class WarehouseProductFolder(BaseModel):
     archived: bool = Field(..., description="Whether the product folder is archived")
 
 
+def _build_stock_rows(rows: list[Dict[str, Any]]) -> list[WarehouseStockItem]:
+    """Convert raw stock report rows into stock items"""
+    return [
+        WarehouseStockItem(
+            name=row.get("name"),
+            stock=row.get("stock"),
+            price=row.get("price"),
+        ) for row in rows
+    ]
+
+
+def _build_positions(products: list[WarehouseProduct], base_url: str) -> list[Dict[str, Any]]:
+    """Convert products into demand positions payload"""
+    return [
+        {
+            "assortment": {
+                "meta": {
+                    "href": f"{base_url}entity/product/{product.id}",
+                    "type": "product",
+                    "mediaType": "application/json"
+                }
+            },
+            "things": product.things,
+            "quantity": 1,
+            "price": product.purchase_price,
+        } for product in products
+    ]
+
+
 class WarehouseClient:
-    def __init__(self, api_url: str, access_token: str):
+    def __init__(self, api_url: str, access_token: str, client: httpx.AsyncClient, concurrency: int = 4):
         self.base_url = api_url
+        self.client = client
+        self.concurrency = concurrency
         self.access_token = access_token
         self.auth_header = {
             "Authorization": f"Bearer {access_token}"
@@ -53,31 +83,30 @@ class WarehouseClient:
 
     async def _make_request(self, method: str, endpoint: str, params: Dict[Any, Any] = None, json: Dict[Any, Any] = None) -> Dict[Any, Any]:
         """Make a rate-limited request to the Warehouse API"""
+        response = await self.client.request(
+            method=method,
+            url=endpoint,
+            params=params,
+            json=json,
+            headers=self.auth_header,
+        )
+
+        if response.status_code == 429:
+            logger.warning("Rate limit exceeded", extra={"headers": dict(response.headers)})
+            # Retry delay is given in milliseconds
+            await asyncio.sleep(int(response.headers.get("X-Lognex-Retry-After", 5000)) / 1000)
+
+            return await self._make_request(method, endpoint, params, json)
         
-        url = urljoin(self.base_url, endpoint)
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method=method,
-                url=url,
-                params=params,
-                json=json,
-                headers=self.auth_header,
-            )
-        
-            if response.status_code == 429:
-                logger.warning("Rate limit exceeded", extra={"headers": dict(response.headers)})
-                asyncio.sleep(response.headers.get("X-Lognex-Retry-After", 5))
-                
-                return await self._make_request(method, endpoint, params, json)
-            
-            response.raise_for_status()
-            return response.json()
+        response.raise_for_status()
+        return response.json()
 
     async def search_product(self, name: str) -> list[WarehouseProduct]:
         """Search for a product in Warehouse by name"""
         response = await self._make_request(
             method="GET",
-            endpoint=f"entity/product/?search={name}",
+            endpoint="entity/product/",
+            params={"search": name},
         )
         
         rows = response.get("rows", [])
@@ -105,18 +134,19 @@ class WarehouseClient:
         
         products: list[WarehouseProduct] = []
         not_found: list[str] = []
-            
-        # batch processing doesn't work because of aggresive rate limits
-        for name in names:
-            try: 
-                result = await self.search_product(name)
-                products.extend(result)
-            except Exception as e:
-                logger.warning(
-                    "Error searching for product",
-                    extra={"product_name": name, "error": str(e)}
-                )
+
+        # batch processing doesn't work because of aggresive rate limits,
+        # so unique names are searched one by one with a few requests in parallel
+        unique_names = list(dict.fromkeys(names))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *(self._search_product_limited(name, semaphore) for name in unique_names)
+        )
+        for name, result in zip(unique_names, results):
+            if result is None:
                 not_found.append(name)
+            else:
+                products.extend(result)
 
         logger.info(
             "Search completed",
@@ -131,6 +161,18 @@ class WarehouseClient:
             not_found=not_found
         )
 
+    async def _search_product_limited(self, name: str, semaphore: asyncio.Semaphore) -> list[WarehouseProduct] | None:
+        """Search for a product holding the semaphore, None if it was not found"""
+        async with semaphore:
+            try:
+                return await self.search_product(name)
+            except Exception as e:
+                logger.warning(
+                    "Error searching for product",
+                    extra={"product_name": name, "error": str(e)}
+                )
+                return None
+
     async def create_demand(
         self,
         organization_id: str,
@@ -163,20 +205,7 @@ class WarehouseClient:
                 "mediaType": "application/json"
                 }
             },
-            "positions": [
-                {
-                    "assortment": {
-                        "meta": {
-                            "href": f"{self.base_url}entity/product/{product.id}",
-                            "type": "product",
-                            "mediaType": "application/json"
-                        }
-                    },
-                    "things": product.things,
-                    "quantity": 1,
-                    "price": product.purchase_price,
-                } for product in products
-            ],
+            "positions": await asyncio.to_thread(_build_positions, products, self.base_url),
         }
 
         response = await self._make_request(
@@ -217,13 +246,7 @@ class WarehouseClient:
         
         result = WarehouseStockSearchResult(
             size=response.get("meta").get("size"),
-            rows=[
-                WarehouseStockItem(
-                    name=row.get("name"),
-                    stock=row.get("stock"),
-                    price=row.get("price"),
-                ) for row in response.get("rows", [])
-            ]
+            rows=await asyncio.to_thread(_build_stock_rows, response.get("rows", []))
         )
         
         logger.debug("Stock search completed", extra={"total_items": result.size})
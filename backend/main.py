@@ -2,8 +2,10 @@ from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, Depends
+from fastapi.responses import ORJSONResponse
 import uvicorn
 
+from backend.clients import clients
 from backend.features.competitors.router import competitors_router
 from backend.features.demands.router import demands_router
 from backend.features.partners.router import partners_router
@@ -14,13 +16,16 @@ from backend.utils.auth import login_header, password_header, get_warehouse_acce
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     load_dotenv()
+    clients.open()
     yield
+    await clients.close()
 
 app = FastAPI(
     title="Girya Storekeeper",
     description="Automation for store keeping tasks",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.include_router(demands_router, prefix="/api/v1", tags=["Demands"])
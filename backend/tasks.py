@@ -1,4 +1,7 @@
-from collections import defaultdict
+import asyncio
+import math
+import time
+from collections import OrderedDict
 from datetime import datetime
 from enum import Enum
 from typing import Optional
@@ -23,27 +26,76 @@ class Task(BaseModel):
 
 
 class TaskStore:
-    _instance = None
-    _tasks = defaultdict(dict)
+    """In-memory task store bounded by size and by TTL of finished tasks.
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(TaskStore, cls).__new__(cls)
-        return cls._instance
+    Tasks are kept in the order they were last set, so the oldest entries are
+    evicted first. All access happens on the event loop without awaiting in
+    between, so no lock is needed.
+    """
+    _max_tasks = 10_000
+    _finished_task_ttl = 3600
+
+    def __init__(self):
+        self._tasks: OrderedDict[str, tuple[float, Task]] = OrderedDict()
+        # Events of watched tasks, set and dropped on the next change of the task
+        self._changes: dict[str, asyncio.Event] = {}
 
     def set_task(self, task_id: str, task_data: Task):
-        self._tasks[task_id] = task_data
+        if task_data.status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+            expires_at = time.monotonic() + self._finished_task_ttl
+        else:
+            expires_at = math.inf
+
+        self._tasks[task_id] = (expires_at, task_data)
+        self._tasks.move_to_end(task_id)
+        self._evict()
+        self._notify(task_id)
 
     def get_task(self, task_id: str, owner: str) -> Optional[Task]:
-        task: Task | None = self._tasks.get(task_id)
-        if task and task.owner == owner:
+        entry = self._tasks.get(task_id)
+        if not entry:
+            return None
+
+        expires_at, task = entry
+        if expires_at <= time.monotonic():
+            del self._tasks[task_id]
+            return None
+        if task.owner == owner:
             return task
         return None
 
     def remove_task(self, task_id: str, owner: str) -> None:
-        task: Task | None = self._tasks.get(task_id)
-        if task and task.owner == owner:
+        task: Task | None = self.get_task(task_id, owner)
+        if task:
             del self._tasks[task_id]
+            self._notify(task_id)
+
+    def changed(self, task_id: str) -> asyncio.Event:
+        """Event that is set on the next change of the task"""
+        event = self._changes.get(task_id)
+        if event is None:
+            event = self._changes[task_id] = asyncio.Event()
+        return event
+
+    def discard_changes(self, task_id: str) -> None:
+        """Drop the change event of a task that is not in the store"""
+        if task_id not in self._tasks:
+            self._changes.pop(task_id, None)
+
+    def _notify(self, task_id: str) -> None:
+        event = self._changes.pop(task_id, None)
+        if event:
+            event.set()
+
+    def _evict(self) -> None:
+        """Drop the oldest tasks above the size limit and expired finished tasks"""
+        now = time.monotonic()
+        while self._tasks:
+            expires_at, _ = next(iter(self._tasks.values()))
+            if len(self._tasks) <= self._max_tasks and expires_at > now:
+                break
+            self._tasks.popitem(last=False)
 
 
-task_store = TaskStore()
\ No newline at end of file
+# Shared by the single uvicorn worker, use this instance instead of creating new ones
+task_store = TaskStore()
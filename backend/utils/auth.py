@@ -1,10 +1,12 @@
+import asyncio
 import base64
-from urllib.parse import urljoin
+import hashlib
 
-import httpx
+from cachetools import TTLCache
 from fastapi import HTTPException
 from fastapi.security import APIKeyHeader
 
+from backend.clients import clients
 from backend.utils.config import get_settings
 from backend.utils.logger import logger
 
@@ -13,25 +15,46 @@ login_header = APIKeyHeader(name="X-Warehouse-Login", scheme_name="Warehouse-Log
 password_header = APIKeyHeader(name="X-Warehouse-Password", scheme_name="Warehouse-Password")
 auth_header = APIKeyHeader(name="Authorization", scheme_name="Bearer")
 
+# Tokens are keyed by a digest of the credentials, raw passwords are never stored
+_token_cache: TTLCache[bytes, str] = TTLCache(maxsize=1024, ttl=get_settings().warehouse_token_ttl)
+_token_locks: dict[bytes, asyncio.Lock] = {}
+
 
 async def get_warehouse_access_token(login: str, password: str) -> str:
-    settings = get_settings()
-    async with httpx.AsyncClient() as client:
-        response = await client.request(
-            method="POST",
-            url=urljoin(settings.warehouse_api_url, "security/token"),
-            headers={
-                "Authorization": f"Basic {base64.b64encode(f'{login}:{password}'.encode()).decode()}"
+    """Get Warehouse access token, reusing a cached one for the same credentials"""
+    key = hashlib.sha256(f"{login}:{password}".encode()).digest()
+    token = _token_cache.get(key)
+    if token:
+        return token
+
+    # Concurrent logins with the same credentials wait for a single token request
+    lock = _token_locks.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            token = _token_cache.get(key)
+            if not token:
+                token = await _request_warehouse_access_token(login=login, password=password)
+                _token_cache[key] = token
+            return token
+    finally:
+        _token_locks.pop(key, None)
+
+
+async def _request_warehouse_access_token(login: str, password: str) -> str:
+    response = await clients.warehouse_http.post(
+        "security/token",
+        headers={
+            "Authorization": f"Basic {base64.b64encode(f'{login}:{password}'.encode()).decode()}"
+        }
+    )
+    if response.status_code not in (200, 201):
+        logger.error(
+            "Failed to get Warehouse access token",
+            extra={
+                "status_code": response.status_code,
+                "response": response.text
             }
         )
-        if response.status_code not in (200, 201):
-            logger.error(
-                "Failed to get Warehouse access token",
-                extra={
-                    "status_code": response.status_code,
-                    "response": response.text
-                }
-            )
-            raise HTTPException(status_code=response.status_code, detail=response.text)
-        
-        return response.json()["access_token"]
+        raise HTTPException(status_code=response.status_code, detail=response.text)
+
+    return response.json()["access_token"]
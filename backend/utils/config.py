@@ -17,21 +17,29 @@ class Settings(BaseSettings):
     warehouse_store_id: str = Field("WAREHOUSE_STORE_ID", description="Warehouse store ID")
     warehouse_main_store_id: str = Field("WAREHOUSE_MAIN_STORE_ID", description="Warehouse main store ID")
     warehouse_android_group_id: str = Field("WAREHOUSE_ANDROID_GROUP_ID", description="Warehouse Android group ID")
+    warehouse_concurrency: int = Field(4, description="Max parallel requests to Warehouse API")
+    warehouse_token_ttl: int = Field(3300, description="Seconds to reuse a Warehouse access token")
 
     # Partners and Competitors
     partners_api_url: str = Field("PARTNERS_API_URL", description="Partners API URL")
     competitors_api_url: str = Field("COMPETITORS_API_URL", description="Competitors API URL")
+    partners_concurrency: int = Field(8, description="Max concurrent requests to Partners site")
+    competitors_concurrency: int = Field(4, description="Max concurrent pages on Competitors site")
 
     # LLMs
     llm_base_url: str | None = Field(None, description="LLM Provider API URL")
     llm_api_key: str = Field("LLM_API_KEY", description="LLM Provider API key")
     llm_name: str = Field("LLM_NAME", description="LLM name")
     llm_provider: str = Field("LLM_PROVIDER", description="LLM provider")
+    llm_concurrency: int = Field(4, description="Max concurrent LLM requests")
+    llm_cache_ttl: int = Field(86_400, description="Seconds to reuse parsed LLM answers")
+    llm_batch_size: int = Field(8, description="Max products parsed in a single LLM request")
+    llm_batch_max_chars: int = Field(100_000, description="Max total HTML length parsed in a single LLM request")
 
     class Config:
         env_file = ".env"
 
 
-# @lru_cache
+@lru_cache
 def get_settings() -> Settings:
     return Settings()
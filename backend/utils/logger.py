@@ -1,14 +1,15 @@
 import datetime
-import json
 import logging
 
+import orjson
+
 from backend.utils.config import get_settings
 
 
 class JSONFormatter(logging.Formatter):
     def format(self, record):
         log_entry = {
-            'timestamp': datetime.datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc),
             'level': record.levelname,
             'message': record.getMessage()
         }
@@ -23,7 +24,7 @@ class JSONFormatter(logging.Formatter):
         if record.exc_info:
             log_entry['exc_info'] = self.formatException(record.exc_info)
 
-        return json.dumps(log_entry)
+        return orjson.dumps(log_entry, default=str, option=orjson.OPT_UTC_Z).decode()
 
 
 def setup_logger(name: str = "app") -> logging.Logger:
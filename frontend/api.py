@@ -1,90 +1,195 @@
 import asyncio
 import os
+import random
+import threading
+from functools import lru_cache
 from typing import Optional, Dict
 
 import httpx
+import orjson
 import streamlit as st
 
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000/api/v1")
 
-def get_auth_headers():
+# Pending GET requests by path, params and token, awaited by every identical caller.
+# Only touched on the background event loop, so no lock is needed.
+_inflight_requests: Dict[tuple, asyncio.Task] = {}
+
+def get_auth_headers(authorization: str):
     return {
-        "Authorization": st.session_state.authorization,
+        "Authorization": authorization,
     }
 
+@lru_cache(maxsize=None)
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Event loop running in a background thread for the whole app process.
+
+    Requests of all sessions run on it, so the shared client keeps its
+    connections alive between reruns.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="api-event-loop", daemon=True).start()
+    return loop
+
+@lru_cache(maxsize=None)
+def get_transport() -> httpx.AsyncHTTPTransport:
+    """Connection pool shared by all clients, used only on the background event loop"""
+    return httpx.AsyncHTTPTransport(
+        http2=True,
+        # Below the backend's 75 seconds keep-alive, so a connection the server closed isn't reused
+        limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60),
+    )
+
+@lru_cache(maxsize=64)
+def get_client(authorization: Optional[str] = None) -> httpx.AsyncClient:
+    """HTTP client sending the given token with every request.
+
+    A client per token keeps users' credentials apart, while all of them
+    share one connection pool.
+    """
+    headers = get_auth_headers(authorization) if authorization else None
+    return httpx.AsyncClient(base_url=API_BASE_URL, headers=headers, transport=get_transport())
+
+def wait_for(coroutine):
+    """Run a coroutine on the background event loop and wait for its result.
+
+    Coroutines run outside of the script thread and can't use st.session_state,
+    so everything they need is passed as arguments.
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, get_event_loop()).result()
+
 def run_async(coroutine):
     """Helper function to run async code in Streamlit"""
     try:
-        return asyncio.run(coroutine)
+        return wait_for(coroutine)
     except Exception as e:
         st.error(f"Error: {str(e)}")
         return None
 
-async def log_in(login: str, password: str):
-    """Login to Warehouse API"""
+@st.cache_data(ttl=60*60, show_spinner=False)
+def load_product_groups(authorization: str) -> tuple[list[str], Dict[str, str]]:
+    """Get product group names and group ids by name, cached per token since they rarely change.
+
+    Errors are raised, so a failed request is not cached.
+    """
+    product_groups = wait_for(get_product_groups(authorization))
+    id_by_name: Dict[str, str] = {}
+    for group in product_groups:
+        id_by_name.setdefault(group["name"], group["id"])
+    return list(id_by_name), id_by_name
+
+async def get_json(path: str, authorization: str, params: Optional[Dict] = None, timeout: float = 5.0) -> Dict:
+    """GET a backend endpoint, sharing the response with identical requests in flight"""
+    key = (path, tuple(sorted((params or {}).items())), authorization)
+    task = _inflight_requests.get(key)
+    if task is None:
+        task = asyncio.create_task(_get_json(path, authorization, params, timeout))
+        _inflight_requests[key] = task
+        task.add_done_callback(lambda _: _inflight_requests.pop(key, None))
+    # A caller that gives up must not cancel the request for the others
+    return await asyncio.shield(task)
+
+async def _get_json(path: str, authorization: str, params: Optional[Dict], timeout: float) -> Dict:
+    response = await get_client(authorization).get(
+        path,
+        params=params,
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+async def log_in(login: str, password: str) -> str:
+    """Login to Warehouse API and return the access token"""
     headers = {
         "X-Warehouse-Login": login,
         "X-Warehouse-Password": password,
     }
-        
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{API_BASE_URL}/auth/login",
-            headers=headers,
-        )
-        response.raise_for_status()
-        st.session_state.authorization = response.json()["access_token"]
-
-async def create_demand(file) -> Optional[Dict]:
-    """Create a demand using the uploaded CSV file"""        
-    async with httpx.AsyncClient() as client:
-        files = {"file": (file.name, file.getvalue(), "text/csv")}
-        response = await client.post(
-            f"{API_BASE_URL}/demands/create",
-            files=files,
-            headers=get_auth_headers(),
-            timeout=60*2,
-        )
-        response.raise_for_status()
-        return response.json()
 
-async def get_partners_stock() -> Optional[Dict]:
+    response = await get_client().post(
+        "auth/login",
+        headers=headers,
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)["access_token"]
+
+async def create_demand(file, authorization: str) -> Optional[Dict]:
+    """Create a demand using the uploaded CSV file"""
+    # Let httpx read the upload in chunks instead of copying it into bytes first
+    file.seek(0)
+    files = {"file": (file.name, file, "text/csv")}
+    response = await get_client(authorization).post(
+        "demands/create",
+        files=files,
+        timeout=60*2,
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+async def get_partners_stock(authorization: str) -> Optional[Dict]:
     """Get current stock information"""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{API_BASE_URL}/partners/stock",
-            headers=get_auth_headers(),
-            timeout=60*5,
-        )
-        response.raise_for_status()
-        return response.json()
+    return await get_json("partners/stock", authorization, timeout=60*5)
 
-async def get_competitors_stock(product_group_id: int) -> Optional[Dict]:
+async def get_competitors_stock(product_group_id: int, authorization: str) -> Optional[Dict]:
     """Get current stock information"""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{API_BASE_URL}/competitors/stock?product_group_id={product_group_id}",
-            headers=get_auth_headers(),
-        )
-        response.raise_for_status()
-        return response.json()
+    return await get_json("competitors/stock", authorization, params={"product_group_id": product_group_id})
 
-async def get_product_groups() -> Optional[Dict]:
+async def get_product_groups(authorization: str) -> Optional[Dict]:
     """Get Apple product groups from warehouse"""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{API_BASE_URL}/competitors/groups",
-            headers=get_auth_headers()
-        )
-        response.raise_for_status()
-        return response.json()
+    return await get_json("competitors/groups", authorization)
 
-async def get_competitors_search_status(task_id: str) -> Optional[Dict]:
+async def get_competitors_search_status(task_id: str, authorization: str) -> Optional[Dict]:
     """Check the status of a competitors search task"""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{API_BASE_URL}/competitors/tasks?task_id={task_id}",
-            headers=get_auth_headers()
-        )
+    return await get_json("competitors/tasks", authorization, params={"task_id": task_id})
+
+async def wait_for_competitors_search(task_id: str, authorization: str, timeout: float = 60*10) -> Optional[Dict]:
+    """Wait until a competitors search task is not running anymore and return its status.
+
+    Waits on the status stream of the task, whose last event carries the search
+    result, and falls back to polling when the stream is not available. A task
+    still running after timeout seconds is reported as failed, so a hung task
+    doesn't block the tab forever.
+    """
+    try:
+        async with asyncio.timeout(timeout):
+            try:
+                status_response = await wait_for_competitors_stream(task_id, authorization)
+            except httpx.HTTPError:
+                status_response = None
+            return status_response or await poll_competitors_search(task_id, authorization)
+    except TimeoutError:
+        return {"status": "failed", "error": "Search is taking too long"}
+
+async def wait_for_competitors_stream(task_id: str, authorization: str) -> Optional[Dict]:
+    """Read server-sent status events of a competitors search task until it is not running.
+
+    Returns the final status, or None if the stream ended before it.
+    """
+    async with get_client(authorization).stream(
+        "GET",
+        "competitors/stream",
+        params={"task_id": task_id},
+        # The backend repeats the status every 15 seconds while the task runs
+        timeout=httpx.Timeout(5.0, read=60.0),
+    ) as response:
         response.raise_for_status()
-        return response.json()
\ No newline at end of file
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            status_response = orjson.loads(line[5:])
+            if status_response.get("status") != "running":
+                return status_response
+    return None
+
+async def poll_competitors_search(task_id: str, authorization: str) -> Optional[Dict]:
+    """Poll a competitors search task until it is not running anymore.
+
+    Polls start often, so short searches are noticed quickly, and slow down
+    exponentially for long ones. Jitter keeps sessions from polling in step.
+    """
+    delay = 0.25
+    while True:
+        status_response = await get_competitors_search_status(task_id, authorization)
+        if status_response.get("status") != "running":
+            return status_response
+        await asyncio.sleep(delay * random.uniform(0.9, 1.1))
+        delay = min(delay * 1.5, 3.0)
\ No newline at end of file
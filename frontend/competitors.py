@@ -1,27 +1,51 @@
-import streamlit as st
 import time
 
-from api import run_async, get_competitors_stock, get_product_groups, get_competitors_search_status
+import pandas as pd
+import streamlit as st
+
+from api import run_async, get_competitors_stock, load_product_groups, wait_for_competitors_search
+from formatting import format_price
+from pagination import paginate
+
+# Seconds after the start of a search to stop waiting for it, across reruns
+SEARCH_TIMEOUT = 60*10
+
+
+def competitors_table(rows: list[dict]) -> pd.DataFrame:
+    """Build a table of stock rows found on Competitors site"""
+    rows = pd.DataFrame(rows, columns=["name", "stock", "price", "found_name", "found_price", "found_url"])
+    return pd.DataFrame({
+        "Product": rows["name"],
+        "Warehouse Stock": rows["stock"],
+        "Warehouse Price": format_price(rows["price"]),
+        "Competitor Product": rows["found_name"],
+        "Competitor Price": rows["found_price"],
+        "Competitor Link": rows["found_url"],
+    })
 
 
 def create_competitors_tab():
     st.header("Warehouse Product Groups")
-    product_groups = run_async(get_product_groups())
+    if st.button("🔄 Refresh Product Groups"):
+        load_product_groups.clear()
+
+    try:
+        group_names, group_ids = load_product_groups(authorization=st.session_state.authorization)
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+        group_names, group_ids = [], {}
     
-    if product_groups:
+    if group_names:
         selected_group = st.selectbox(
             "Select a Product Group",
-            options=[group["name"] for group in product_groups],
+            options=group_names,
             key="selected_product_group"
         )
-        st.session_state.selected_product_group_id = next(
-            (group["id"] for group in product_groups if group["name"] == selected_group),
-            None
-        )
+        st.session_state.selected_product_group_id = group_ids.get(selected_group)
                 
     st.divider()
     st.header("Competitors Stock")
-    if product_groups and selected_group:
+    if group_names and selected_group:
         st.write(f"Check competitors stock for {selected_group}")
     else:
         st.warning("Please select a group")
@@ -33,60 +57,60 @@ def create_competitors_tab():
 
     if st.button("🔄 Refresh Competitors Stock", disabled=st.session_state.competitors_task_running):
         st.session_state.competitors_task_running = True
-        response = run_async(get_competitors_stock(product_group_id=st.session_state.selected_product_group_id))
+        response = run_async(get_competitors_stock(
+            product_group_id=st.session_state.selected_product_group_id,
+            authorization=st.session_state.authorization,
+        ))
         
         if response and response.get("status") == "success":
-            st.session_state.task_id = response["task_id"]
+            st.session_state.competitors_task = {"id": response["task_id"], "started": time.monotonic()}
             st.session_state.competitors_data = None
         else:
             st.error("Failed to start competitors search")
             st.session_state.competitors_task_running = False
 
+    if st.session_state.competitors_task_running:
+        # A rerun may resume the wait, it only gets the time left since the search started
+        task = st.session_state.get("competitors_task")
+        remaining = SEARCH_TIMEOUT - (time.monotonic() - task["started"]) if task else 0
+        if remaining <= 0:
+            st.session_state.competitors_task_running = False
+            st.error("Search task is lost or took too long")
+
     if st.session_state.competitors_task_running:
         with st.spinner("Searching competitors..."):
             placeholder = st.empty()
-            while True:
-                status_response = run_async(get_competitors_search_status(task_id=st.session_state.task_id))
-                
-                if status_response:
-                    status = status_response.get("status")
-                    if status == "completed":
-                        st.session_state.competitors_task_running = False
-                        st.session_state.competitors_data = status_response.get("result")
-                        break
-                    elif status == "failed":
-                        placeholder.error(f"Search failed: {status_response.get('error', 'Unknown error')}")
-                        st.session_state.competitors_task_running = False
-                        break
-                    elif status == "not_found":
-                        placeholder.error("Search task not found")
-                        st.session_state.competitors_task_running = False
-                        break
-                    else:
-                        time.sleep(10)
+            status_response = run_async(wait_for_competitors_search(
+                task_id=task["id"],
+                authorization=st.session_state.authorization,
+                timeout=remaining,
+            ))
+            st.session_state.competitors_task_running = False
+
+            if status_response:
+                status = status_response.get("status")
+                if status == "completed" and status_response.get("result"):
+                    # Built once per search result, reruns render the stored table
+                    st.session_state.competitors_data = competitors_table(status_response["result"]["rows"])
+                    st.session_state.pop("competitors_page", None)
+                elif status == "failed":
+                    placeholder.error(f"Search failed: {status_response.get('error', 'Unknown error')}")
+                elif status == "not_found":
+                    placeholder.error("Search task not found")
 
     # Display results if available
-    if st.session_state.competitors_data:
-        if st.session_state.competitors_data["size"] > 0:
-            table_data = [
-                {
-                    "Product": row.get("name", "Not Found"),
-                    "Warehouse Stock": row.get("stock", "-"),
-                    "Warehouse Price": f"{row.get('price', 0) / 100} RUB",
-                    "Competitor Product": row.get("found_name", "Not Found"),
-                    "Competitor Price": row.get("found_price", "Not Found"),
-                    "Competitor Link": row.get("found_url", "Not Found"),
-                } for row in st.session_state.competitors_data["rows"]
-            ]
-            st.markdown(f"Found {st.session_state.competitors_data['size']} products")
+    table_data = st.session_state.competitors_data
+    if table_data is not None:
+        if len(table_data) > 0:
+            st.markdown(f"Found {len(table_data)} products")
             st.dataframe(
-                data=table_data,
+                data=paginate(table_data, key="competitors_page"),
                 use_container_width=True,
                 hide_index=True,
                 column_config={
                     "Competitor Link": st.column_config.LinkColumn(
                         "Competitor Link",
-                        validate="^https?://.*",
+                        validate="^https?://",
                     ),
                 }
             )
@@ -1,7 +1,42 @@
 import httpx
+import pandas as pd
 import streamlit as st
 
 from api import run_async, create_demand
+from formatting import format_price
+
+# Columns the backend reads from the CSV file
+REQUIRED_COLUMNS = ["÷", "Товар", "Цена поставки"]
+
+# Display names of CSV row fields
+ROW_COLUMNS = {
+    "serial_number": "Serial Number",
+    "product_name": "Product Name",
+    "purchase_price": "Purchase Price",
+}
+
+# Result rows that didn't make it into the demand and their warnings
+PROBLEM_ROWS = [
+    ("not_found_rows", "Products not found in Warehouse"),
+    ("unmatched_rows", "Serial numbers not matched"),
+    ("invalid_rows", "Ignored products from file"),
+]
+
+def rows_table(rows: list[dict]) -> pd.DataFrame:
+    """Build a table of CSV rows with purchase prices in rubles"""
+    table = pd.DataFrame(rows, columns=list(ROW_COLUMNS)).rename(columns=ROW_COLUMNS)
+    table["Purchase Price"] = format_price(table["Purchase Price"])
+    return table
+
+def missing_columns(file) -> list[str]:
+    """Check the CSV header before uploading and return required columns it lacks"""
+    try:
+        columns = pd.read_csv(file, nrows=0, encoding="utf-8").columns
+    except pd.errors.EmptyDataError:
+        return REQUIRED_COLUMNS
+    finally:
+        file.seek(0)
+    return [column for column in REQUIRED_COLUMNS if column not in columns]
 
 def create_demand_tab():
     st.header("Create Demand from CSV")
@@ -21,53 +56,28 @@ def create_demand_tab():
     )
     
     if uploaded_file is not None:
+        try:
+            missing = missing_columns(uploaded_file)
+        except (UnicodeDecodeError, pd.errors.ParserError):
+            st.error("CSV file must be a UTF-8 encoded comma separated file")
+            return
+        if missing:
+            st.error(f"CSV file is missing columns: {', '.join(missing)}")
+            return
+
         if st.button("Create Demand", type="primary"):
             with st.spinner("Creating demand..."):
                 try:
-                    result = run_async(create_demand(file=uploaded_file))
+                    result = run_async(create_demand(file=uploaded_file, authorization=st.session_state.authorization))
                     if result and "demand" in result:
                         st.success(f"✅ Demand created successfully!")
-                        table_data = [
-                            {
-                                "Serial Number": product["serial_number"],
-                                "Product Name": product["product_name"],
-                                "Purchase Price": product["purchase_price"] / 100
-                            } for product in result["processed_rows"] 
-                        ]
-                        st.table(table_data)
+                        st.dataframe(rows_table(result["processed_rows"]), use_container_width=True, hide_index=True)
 
-                        if result["not_found_rows"]:
-                            st.warning(f"Products not found in Warehouse")
-                            table_data = [
-                                {
-                                    "Serial Number": row["serial_number"],
-                                    "Product Name": row["product_name"],
-                                    "Purchase Price": row["purchase_price"] / 100
-                                } for row in result["not_found_rows"]
-                            ]
-                            st.table(table_data)
-                        
-                        if result["unmatched_rows"]:
-                            st.warning(f"Serial numbers not matched")
-                            table_data = [
-                                {
-                                    "Serial Number": row["serial_number"],
-                                    "Product Name": row["product_name"],
-                                    "Purchase Price": row["purchase_price"] / 100
-                                } for row in result["unmatched_rows"]
-                            ]
-                            st.table(table_data)
-                        
-                        if result["invalid_rows"]:
-                            st.warning(f"Ignored products from file")
-                            table_data = [
-                                {
-                                    "Serial Number": row["serial_number"] if row["serial_number"] else "—" ,
-                                    "Product Name": row["product_name"] if row["product_name"] else "—" ,
-                                    "Purchase Price": row["purchase_price"] / 100 if row["purchase_price"] else "—" 
-                                } for row in result["invalid_rows"]
-                            ]
-                            st.table(table_data)
+                        for key, warning in PROBLEM_ROWS:
+                            if result[key]:
+                                st.warning(warning)
+                                table = rows_table(result[key]).replace("", "—").fillna("—")
+                                st.dataframe(table, use_container_width=True, hide_index=True)
                 except httpx.HTTPStatusError as e:
                     st.error(f"Error creating demand: {e.response.text}")
                 except Exception as e:
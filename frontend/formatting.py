@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+
+
+def format_price(prices: pd.Series) -> pd.Series:
+    """Format prices in kopecks as rubles, e.g. 798525 -> "7985.25 RUB".
+
+    Integer division keeps kopecks exact, missing prices are shown as "—".
+    """
+    prices = pd.to_numeric(prices, errors="coerce")
+    kopecks = prices.fillna(0).round().to_numpy(dtype=np.int64)
+
+    sign = pd.Series(np.where(kopecks < 0, "-", ""), index=prices.index)
+    rubles = pd.Series(np.abs(kopecks) // 100, index=prices.index).astype(str)
+    rest = pd.Series(np.abs(kopecks) % 100, index=prices.index).astype(str).str.zfill(2)
+    formatted = sign + rubles + "." + rest + " RUB"
+    return formatted.mask(prices.isna(), "—")
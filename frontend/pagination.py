@@ -0,0 +1,19 @@
+import pandas as pd
+import streamlit as st
+
+PAGE_SIZE = 500
+
+
+def paginate(table: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Show a page selector for long tables and return rows of the selected page.
+
+    Only the page is sent to the browser instead of the whole table.
+    Drop the key from st.session_state when the table is replaced.
+    """
+    pages = max(1, -(-len(table) // PAGE_SIZE))
+    if pages == 1:
+        return table
+
+    page = st.number_input(f"Page of {pages}", min_value=1, max_value=pages, value=1, step=1, key=key)
+    start = (page - 1) * PAGE_SIZE
+    return table.iloc[start:start + PAGE_SIZE]
@@ -1,6 +1,21 @@
+import pandas as pd
 import streamlit as st
 
 from api import run_async, get_partners_stock
+from formatting import format_price
+from pagination import paginate
+
+
+def partners_table(rows: list[dict]) -> pd.DataFrame:
+    """Build a table of stock rows found on Partners site"""
+    rows = pd.DataFrame(rows, columns=["name", "stock", "price", "found_name", "found_url"])
+    return pd.DataFrame({
+        "Product": rows["name"],
+        "Warehouse Stock": rows["stock"],
+        "Warehouse Price": format_price(rows["price"]),
+        "Partner Product": rows["found_name"],
+        "Partner Link": rows["found_url"],
+    })
 
 
 def create_partners_tab():
@@ -8,31 +23,28 @@ def create_partners_tab():
     
     if st.button("🔄 Refresh Partners Data"):
         with st.spinner("Fetching stock data..."):
-            stock_data = run_async(get_partners_stock())
+            stock_data = run_async(get_partners_stock(authorization=st.session_state.authorization))
             if stock_data and "rows" in stock_data:
-                if stock_data["size"] > 0:
-                    table_data = [
-                        {
-                            "Product": row["name"],
-                            "Warehouse Stock": row.get("stock", "-"),
-                            "Warehouse Price": f"{row.get('price', 0) / 100} RUB",
-                            "Partner Product": row.get("found_name", "Not Found"),
-                            "Partner Link": row.get("found_url", "Not Found"),
-                        } for row in stock_data["rows"]
-                    ]
-                    st.markdown(f"Found {stock_data['size']} products")
-                    st.dataframe(
-                        data=table_data,
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config={
-                            "Partner Link": st.column_config.LinkColumn(
-                                "Partner Link",
-                                validate="^https?://.*",
-                            ),
-                        }
-                    )
-                else:
-                    st.info("No stock data available")
+                st.session_state.partners_data = partners_table(stock_data["rows"])
+                st.session_state.pop("partners_page", None)
             else:
                 st.error("Failed to fetch stock data")
+
+    # The last fetched table is kept, so it doesn't disappear on other widgets' reruns
+    table_data = st.session_state.get("partners_data")
+    if table_data is not None:
+        if len(table_data) > 0:
+            st.markdown(f"Found {len(table_data)} products")
+            st.dataframe(
+                data=paginate(table_data, key="partners_page"),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Partner Link": st.column_config.LinkColumn(
+                        "Partner Link",
+                        validate="^https?://",
+                    ),
+                }
+            )
+        else:
+            st.info("No stock data available")
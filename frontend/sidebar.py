@@ -14,7 +14,9 @@ def create_sidebar():
         password = st.text_input("Password", type="password")
     
         if st.form_submit_button("Login"):
-            run_async(log_in(login=login, password=password))
+            authorization = run_async(log_in(login=login, password=password))
+            if authorization:
+                st.session_state.authorization = authorization
             if st.session_state.authorization:
                 st.success("✅ Authenticated!")
             else: